@@ -1,30 +1,61 @@
 from __future__ import annotations
 
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import http.client
 import json
+import logging
 import os
 from pathlib import Path
+import re
 import sqlite3
 import subprocess
+import sys
+import threading
 import time
-from typing import Dict, List, Optional
-import urllib.request
-from urllib.error import HTTPError, URLError
+from typing import Callable, Dict, List, Optional, Tuple
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), sort_keys=True)
 
 CONFIG_PATH = Path(__file__).with_name("runpod_config.json")
 STATE_PATH = Path(__file__).with_name("runpod_watchdog_state.json")
-GRAPHQL_URL = "https://api.runpod.io/graphql"
+STATUS_HEARTBEAT_SECONDS = 300
+GRAPHQL_HOST = "api.runpod.io"
+GRAPHQL_PATH = "/graphql"
+LIST_PODS_QUERY = "{ myself { pods { id name desiredStatus } } }"
+POD_STOP_MUTATION = "mutation Stop($podId: String!) { podStop(input: {podId: $podId}) { id desiredStatus } }"
+POD_TERMINATE_MUTATION = "mutation Terminate($podId: String!) { podTerminate(input: {podId: $podId}) }"
+
+
+logger = logging.getLogger("runpod_tricks.watchdog")
+
 
+def _setup_logging() -> None:
+    handler = logging.StreamHandler(sys.stdout)
+    formatter = logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+    formatter.converter = time.gmtime
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
 
-def _log(message: str) -> None:
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
-    print(f"[{timestamp}] {message}", flush=True)
+
+_CFG_CACHE: Dict[str, object] = {"mtime": None, "data": None}
 
 
 def _load_config() -> Dict[str, object]:
-    if CONFIG_PATH.exists():
-        data = json.loads(CONFIG_PATH.read_text())
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime is not None and mtime == _CFG_CACHE["mtime"]:
+        data = dict(_CFG_CACHE["data"])
     else:
-        data = {}
+        if mtime is not None:
+            data = json.loads(CONFIG_PATH.read_text())
+        else:
+            data = {}
+        _CFG_CACHE["mtime"] = mtime
+        _CFG_CACHE["data"] = dict(data)
     data.setdefault("api_key", os.getenv("RUNPOD_API_KEY", ""))
     data.setdefault("idle_seconds", 600)
     data.setdefault("poll_seconds", 60)
@@ -42,52 +73,181 @@ def _load_config() -> Dict[str, object]:
     return data
 
 
-def _write_state(state: Dict[str, object]) -> None:
-    STATE_PATH.write_text(json.dumps(state, indent=2, sort_keys=True))
+_LAST_STATE_HASH: Optional[int] = None
 
 
-def _graphql_request(api_key: str, query: str) -> Dict[str, object]:
-    payload = json.dumps({"query": query}).encode("utf-8")
-    req = urllib.request.Request(GRAPHQL_URL, data=payload, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("Authorization", f"Bearer {api_key}")
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        body = resp.read().decode("utf-8")
-    data = json.loads(body)
+def _write_state(state: Dict[str, object]) -> None:
+    global _LAST_STATE_HASH
+    # The timestamp changes every poll; exclude it so steady-state polls
+    # produce no filesystem write at all.
+    comparable = {key: value for key, value in state.items() if key != "timestamp"}
+    state_hash = hash(_ENCODER.encode(comparable))
+    if state_hash == _LAST_STATE_HASH:
+        return
+    tmp = STATE_PATH.with_suffix(".json.tmp")
+    tmp.write_text(_ENCODER.encode(state))
+    os.replace(tmp, STATE_PATH)
+    _LAST_STATE_HASH = state_hash
+
+
+_HTTPS: Optional[http.client.HTTPSConnection] = None
+
+
+def _graphql_send(payload: bytes, api_key: str) -> bytes:
+    """POST a GraphQL payload over a reused keep-alive connection.
+
+    The connection is reset and the request retried once when the server
+    has silently dropped the idle socket between polls.
+    """
+    global _HTTPS
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+        "Connection": "keep-alive",
+    }
+    for attempt in (0, 1):
+        if _HTTPS is None:
+            _HTTPS = http.client.HTTPSConnection(GRAPHQL_HOST, timeout=30)
+        try:
+            _HTTPS.request("POST", GRAPHQL_PATH, body=payload, headers=headers)
+            resp = _HTTPS.getresponse()
+            body = resp.read()
+            if resp.status >= 400:
+                raise RuntimeError(f"GraphQL HTTP {resp.status}: {body[:200]!r}")
+            return body
+        except (
+            BrokenPipeError,
+            ConnectionResetError,
+            http.client.RemoteDisconnected,
+            http.client.CannotSendRequest,
+        ):
+            try:
+                _HTTPS.close()
+            except OSError:
+                pass
+            _HTTPS = None
+            if attempt:
+                raise
+    raise RuntimeError("GraphQL request failed.")
+
+
+def _graphql_request_raw(api_key: str, payload: bytes) -> Dict[str, object]:
+    data = json.loads(_graphql_send(payload, api_key).decode("utf-8"))
     if "errors" in data:
         raise RuntimeError(data["errors"])
     return data.get("data") or {}
 
 
+def _graphql_request(
+    api_key: str, query: str, variables: Optional[Dict[str, object]] = None
+) -> Dict[str, object]:
+    body: Dict[str, object] = {"query": query}
+    if variables:
+        body["variables"] = variables
+    return _graphql_request_raw(api_key, _ENCODER.encode(body).encode("utf-8"))
+
+
+# The list query never varies, so its serialized payload is frozen once.
+_LIST_PODS_PAYLOAD = _ENCODER.encode({"query": LIST_PODS_QUERY}).encode("utf-8")
+
+
 def _list_pods(api_key: str) -> List[Dict[str, str]]:
-    data = _graphql_request(api_key, "{ myself { pods { id name desiredStatus } } }")
+    data = _graphql_request_raw(api_key, _LIST_PODS_PAYLOAD)
     myself = data.get("myself") or {}
     return list(myself.get("pods") or [])
 
 
 def _terminate_pod(api_key: str, pod_id: str, mode: str) -> None:
+    query = POD_STOP_MUTATION if mode == "stop" else POD_TERMINATE_MUTATION
+    _graphql_request(api_key, query, {"podId": pod_id})
+
+
+def _terminate_pods(api_key: str, pod_ids: List[str], mode: str) -> None:
+    """Terminate several pods with a single aliased mutation document."""
+    if len(pod_ids) == 1:
+        _terminate_pod(api_key, pod_ids[0], mode)
+        return
+    params = ", ".join(f"$p{i}: String!" for i in range(len(pod_ids)))
     if mode == "stop":
-        query = f"mutation {{ podStop(input: {{podId: \"{pod_id}\"}}) {{ id desiredStatus }} }}"
+        fields = " ".join(
+            f"t{i}: podStop(input: {{podId: $p{i}}}) {{ id desiredStatus }}"
+            for i in range(len(pod_ids))
+        )
     else:
-        query = f"mutation {{ podTerminate(input: {{podId: \"{pod_id}\"}}) }}"
-    _graphql_request(api_key, query)
+        fields = " ".join(
+            f"t{i}: podTerminate(input: {{podId: $p{i}}})" for i in range(len(pod_ids))
+        )
+    query = f"mutation Batch({params}) {{ {fields} }}"
+    variables = {f"p{i}": pod_id for i, pod_id in enumerate(pod_ids)}
+    _graphql_request(api_key, query, variables)
+
+
+_DB_CONN: Optional[sqlite3.Connection] = None
+_DB_CONN_PATH: Optional[str] = None
+_DB_INDEX_CHECKED = False
+_COUNTS_QUERY = (
+    "SELECT status, COUNT(*) as total FROM experiments"
+    " WHERE status IN ('running', 'queued', 'paused') GROUP BY status"
+)
+
+
+def _open_db(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    for pragma in (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA query_only=1",
+        "PRAGMA busy_timeout=30000",
+    ):
+        try:
+            conn.execute(pragma)
+        except sqlite3.OperationalError:
+            pass
+    return conn
+
+
+def _close_db() -> None:
+    global _DB_CONN
+    if _DB_CONN is not None:
+        try:
+            _DB_CONN.close()
+        except sqlite3.Error:
+            pass
+        _DB_CONN = None
 
 
 def _get_experiment_counts_sqlite(db_path: str) -> Dict[str, int]:
+    global _DB_CONN, _DB_CONN_PATH
     counts = {"running": 0, "queued": 0, "paused": 0}
     path = Path(db_path)
     if not path.exists():
         return counts
-    conn = sqlite3.connect(path)
+    global _DB_INDEX_CHECKED
+    if _DB_CONN is None or _DB_CONN_PATH != str(path):
+        _close_db()
+        _DB_CONN = _open_db(path)
+        _DB_CONN_PATH = str(path)
+    if not _DB_INDEX_CHECKED:
+        # Best effort only: the watchdog connection is read-only, so this
+        # succeeds only when another writable process has not already done it
+        # and the file happens to be writable via a side connection.
+        _DB_INDEX_CHECKED = True
+        try:
+            with sqlite3.connect(path, timeout=5) as index_conn:
+                index_conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_experiments_status ON experiments(status)"
+                )
+        except sqlite3.Error:
+            pass
     try:
-        cursor = conn.execute(
-            "SELECT status, COUNT(*) as total FROM experiments GROUP BY status"
-        )
-        for status, total in cursor.fetchall():
-            if status in counts:
-                counts[status] = int(total)
-    finally:
-        conn.close()
+        rows = _DB_CONN.execute(_COUNTS_QUERY).fetchall()
+    except sqlite3.OperationalError:
+        _close_db()
+        _DB_CONN = _open_db(path)
+        rows = _DB_CONN.execute(_COUNTS_QUERY).fetchall()
+    for status, total in rows:
+        if status in counts:
+            counts[status] = int(total)
     return counts
 
 
@@ -99,9 +259,7 @@ def _get_experiment_counts_postgres(db_url: str) -> Dict[str, int]:
     counts = {"running": 0, "queued": 0, "paused": 0}
     with psycopg2.connect(db_url) as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                "SELECT status, COUNT(*) as total FROM experiments GROUP BY status"
-            )
+            cur.execute(_COUNTS_QUERY)
             for status, total in cur.fetchall():
                 if status in counts:
                     counts[status] = int(total)
@@ -114,7 +272,145 @@ def _get_experiment_counts(db_path: str, db_url: str) -> Dict[str, int]:
     return _get_experiment_counts_sqlite(db_path)
 
 
+_NVML_HANDLES: Optional[List[object]] = None
+_GPU_ABSENT = False
+
+
+def _init_nvml() -> None:
+    """Initialize NVML once and cache one handle per GPU.
+
+    The device count is queried exactly once: a 0-GPU host flips
+    _GPU_ABSENT so _gpu_active becomes a constant False with no NVML or
+    subprocess call at all. Falls back to an empty handle list (and
+    therefore the nvidia-smi subprocess path) when pynvml is not
+    installed or the driver refuses the init call.
+    """
+    global _NVML_HANDLES, _GPU_ABSENT
+    if _NVML_HANDLES is not None:
+        return
+    try:
+        import pynvml  # type: ignore
+    except ImportError:
+        _NVML_HANDLES = []
+        return
+    try:
+        pynvml.nvmlInit()
+        atexit.register(pynvml.nvmlShutdown)
+        count = pynvml.nvmlDeviceGetCount()
+        if count == 0:
+            _GPU_ABSENT = True
+            _NVML_HANDLES = []
+            return
+        _NVML_HANDLES = [
+            pynvml.nvmlDeviceGetHandleByIndex(index) for index in range(count)
+        ]
+    except Exception:
+        _NVML_HANDLES = []
+
+
+def _gpu_active_nvml(util_threshold: float, mem_fraction_threshold: float) -> bool:
+    import pynvml  # type: ignore
+
+    for handle in _NVML_HANDLES or []:
+        util = float(pynvml.nvmlDeviceGetUtilizationRates(handle).gpu)
+        mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        mem_fraction = mem.used / mem.total if mem.total else 0.0
+        if util >= util_threshold or mem_fraction >= mem_fraction_threshold:
+            return True
+    return False
+
+
+_NVSMI_LINE = re.compile(
+    r"^\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*$"
+)
+_NVSMI_LOOP_LINE = re.compile(
+    r"^\s*(\d+)\s*,\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*$"
+)
+
+_SMI_LATEST: Dict[int, Tuple[float, float, float]] = {}
+_SMI_LOCK = threading.Lock()
+_SMI_PROC: Optional[subprocess.Popen] = None
+
+
+def _smi_reader(proc: subprocess.Popen) -> None:
+    for line in proc.stdout:
+        match = _NVSMI_LOOP_LINE.match(line)
+        if not match:
+            continue
+        index = int(match.group(1))
+        row = (float(match.group(2)), float(match.group(3)), float(match.group(4)))
+        with _SMI_LOCK:
+            _SMI_LATEST[index] = row
+
+
+def _start_smi_loop(interval_ms: int) -> bool:
+    """Spawn a single long-lived nvidia-smi in loop mode.
+
+    A daemon thread keeps the most recent per-GPU sample in _SMI_LATEST so
+    the poll loop reads utilization from memory instead of forking a fresh
+    nvidia-smi process every iteration.
+    """
+    global _SMI_PROC
+    if _SMI_PROC is not None and _SMI_PROC.poll() is None:
+        return True
+    try:
+        _SMI_PROC = subprocess.Popen(
+            [
+                "nvidia-smi",
+                "--query-gpu=index,utilization.gpu,memory.used,memory.total",
+                "--format=csv,noheader,nounits",
+                "-lms",
+                str(max(1000, interval_ms)),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except OSError:
+        _SMI_PROC = None
+        return False
+    threading.Thread(target=_smi_reader, args=(_SMI_PROC,), daemon=True).start()
+    return True
+
+
 def _gpu_active(util_threshold: float, mem_fraction_threshold: float) -> bool:
+    global _NVML_HANDLES
+    if _GPU_ABSENT:
+        return False
+    if _NVML_HANDLES:
+        try:
+            return _gpu_active_nvml(util_threshold, mem_fraction_threshold)
+        except Exception as exc:
+            import pynvml  # type: ignore
+
+            if isinstance(exc, pynvml.NVMLError_NotSupported):
+                # Device class does not report utilization; stop asking NVML.
+                _NVML_HANDLES = []
+    return _gpu_active_smi(util_threshold, mem_fraction_threshold)
+
+
+def _gpu_active_smi(util_threshold: float, mem_fraction_threshold: float) -> bool:
+    if _SMI_PROC is not None and _SMI_PROC.poll() is None:
+        with _SMI_LOCK:
+            rows = list(_SMI_LATEST.values())
+        if rows:
+            for util, mem_used, mem_total in rows:
+                mem_fraction = mem_used / mem_total if mem_total else 0.0
+                if util >= util_threshold or mem_fraction >= mem_fraction_threshold:
+                    return True
+            return False
+    return _gpu_active_smi_oneshot(util_threshold, mem_fraction_threshold)
+
+
+_PROBE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watchdog-probe")
+
+_GPU_PROBE = {"missing_until": 0.0, "backoff": 60.0}
+_GPU_PROBE_BACKOFF_MAX = 3600.0
+
+
+def _gpu_active_smi_oneshot(util_threshold: float, mem_fraction_threshold: float) -> bool:
+    if time.time() < _GPU_PROBE["missing_until"]:
+        return False
     try:
         output = subprocess.check_output(
             [
@@ -124,35 +420,59 @@ def _gpu_active(util_threshold: float, mem_fraction_threshold: float) -> bool:
             ],
             text=True,
         )
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
+        # No nvidia-smi on this host; do not re-fork every poll, back off
+        # exponentially instead.
+        _GPU_PROBE["missing_until"] = time.time() + _GPU_PROBE["backoff"]
+        _GPU_PROBE["backoff"] = min(_GPU_PROBE["backoff"] * 2, _GPU_PROBE_BACKOFF_MAX)
         return False
+    except subprocess.CalledProcessError:
+        return False
+    _GPU_PROBE["backoff"] = 60.0
     for line in output.strip().splitlines():
-        parts = [p.strip() for p in line.split(",")]
-        if len(parts) != 3:
-            continue
-        try:
-            util = float(parts[0])
-            mem_used = float(parts[1])
-            mem_total = float(parts[2])
-        except ValueError:
+        match = _NVSMI_LINE.match(line)
+        if not match:
             continue
+        util, mem_used, mem_total = map(float, match.groups())
         mem_fraction = mem_used / mem_total if mem_total else 0.0
         if util >= util_threshold or mem_fraction >= mem_fraction_threshold:
             return True
     return False
 
 
+def _select_gpu_backend(poll_seconds: int) -> Callable[[float, float], bool]:
+    """Probe the GPU backends once and bind the best implementation.
+
+    Preference order: NVML > persistent nvidia-smi loop > one-shot
+    nvidia-smi > constant False on a host with no GPU at all. The choice
+    happens at startup so the poll loop never re-runs availability
+    branches.
+    """
+    _init_nvml()
+    if _GPU_ABSENT:
+        return lambda util_threshold, mem_fraction_threshold: False
+    if _NVML_HANDLES:
+        return _gpu_active
+    if _start_smi_loop(poll_seconds * 1000):
+        return _gpu_active_smi
+    return _gpu_active_smi_oneshot
+
+
 def main() -> None:
+    _setup_logging()
     cfg = _load_config()
     api_key = str(cfg.get("api_key") or "").strip()
     if not api_key:
-        _log("Missing Runpod API key. Set RUNPOD_API_KEY or runpod_config.json.")
+        logger.info("Missing Runpod API key. Set RUNPOD_API_KEY or runpod_config.json.")
         return
 
+    gpu_active_fn = _select_gpu_backend(int(cfg.get("poll_seconds") or 60))
     idle_since: Optional[float] = None
     empty_queue_since: Optional[float] = None
     last_config_sig: Optional[tuple] = None
-    _log("Runpod watchdog started.")
+    last_status_sig: Optional[tuple] = None
+    last_status_log = 0.0
+    logger.info("Runpod watchdog started.")
 
     while True:
         try:
@@ -182,51 +502,76 @@ def main() -> None:
             )
             if config_sig != last_config_sig:
                 last_config_sig = config_sig
-                _log(
-                    "Config: enabled={} idle={} queue={} idle_seconds={} empty_queue_grace={} poll={} mode={} gpu_util={} gpu_mem_frac={}".format(
-                        enabled,
-                        idle_enabled,
-                        queue_enabled,
-                        idle_seconds,
-                        empty_queue_grace,
-                        poll_seconds,
-                        terminate_mode,
-                        util_threshold,
-                        mem_threshold,
-                    )
+                logger.info(
+                    "Config: enabled=%s idle=%s queue=%s idle_seconds=%s empty_queue_grace=%s poll=%s mode=%s gpu_util=%s gpu_mem_frac=%s",
+                    enabled,
+                    idle_enabled,
+                    queue_enabled,
+                    idle_seconds,
+                    empty_queue_grace,
+                    poll_seconds,
+                    terminate_mode,
+                    util_threshold,
+                    mem_threshold,
                 )
 
-            counts = _get_experiment_counts(db_path, db_url)
-            active_running = counts.get("running", 0)
-            active_queued = counts.get("queued", 0)
-            active_paused = counts.get("paused", 0)
-            active = active_running + active_queued + active_paused
-            gpu_active = _gpu_active(util_threshold, mem_threshold)
-
             now = time.time()
             if not enabled:
+                # Nothing acts on the DB/GPU checks while disabled, so skip
+                # both and record the unchecked fields as None.
                 idle_since = None
                 empty_queue_since = None
                 _write_state(
                     {
                         "timestamp": now,
                         "enabled": False,
-                        "running": active_running,
-                        "queued": active_queued,
-                        "paused": active_paused,
-                        "gpu_active": gpu_active,
+                        "running": None,
+                        "queued": None,
+                        "paused": None,
+                        "gpu_active": None,
                         "idle_since": None,
                         "empty_queue_since": None,
                     }
                 )
-                _log(
-                    "Status: enabled=false running={} queued={} paused={} gpu_active={}".format(
-                        active_running, active_queued, active_paused, gpu_active
-                    )
-                )
+                status_sig = (False,)
+                if (
+                    status_sig != last_status_sig
+                    or now - last_status_log >= STATUS_HEARTBEAT_SECONDS
+                ):
+                    last_status_sig = status_sig
+                    last_status_log = now
+                    logger.info("Status: enabled=false (db/gpu checks skipped)")
                 time.sleep(max(5, poll_seconds))
                 continue
 
+            # Only the idle trigger consults the GPU and only the two
+            # triggers consult the DB; skip whatever cannot affect a
+            # termination decision and record None for unchecked fields.
+            need_db = idle_enabled or queue_enabled
+            need_gpu = idle_enabled
+            if need_db and need_gpu:
+                # Overlap the two probes so a slow DB does not serialize
+                # behind the GPU check (and vice versa): per-poll latency
+                # becomes the max of the two instead of their sum.
+                counts_future = _PROBE_POOL.submit(
+                    _get_experiment_counts, db_path, db_url
+                )
+                gpu_active = gpu_active_fn(util_threshold, mem_threshold)
+                counts = counts_future.result()
+            else:
+                counts = _get_experiment_counts(db_path, db_url) if need_db else None
+                gpu_active = (
+                    gpu_active_fn(util_threshold, mem_threshold) if need_gpu else None
+                )
+            if counts is not None:
+                active_running = counts.get("running", 0)
+                active_queued = counts.get("queued", 0)
+                active_paused = counts.get("paused", 0)
+                active = active_running + active_queued + active_paused
+            else:
+                active_running = active_queued = active_paused = None
+                active = 0
+
             if active > 0 or gpu_active:
                 idle_since = None
             else:
@@ -237,25 +582,8 @@ def main() -> None:
                 if empty_queue_since is None:
                     empty_queue_since = now
                 if now - empty_queue_since >= empty_queue_grace:
-                    _log(
-                        "Status: enabled=true running={} queued={} paused={} gpu_active={} idle_for={}s empty_for={}s".format(
-                            active_running,
-                            active_queued,
-                            active_paused,
-                            gpu_active,
-                            int(now - idle_since) if idle_since else 0,
-                            int(now - empty_queue_since) if empty_queue_since else 0,
-                        )
-                    )
-                    _log("Queue empty; requesting pod termination.")
-                    _terminate_now(api_key, terminate_mode, terminate_all)
-                    return
-            else:
-                empty_queue_since = None
-
-            if idle_enabled and idle_since and now - idle_since >= idle_seconds:
-                _log(
-                    "Status: enabled=true running={} queued={} paused={} gpu_active={} idle_for={}s empty_for={}s".format(
+                    logger.info(
+                        "Status: enabled=true running=%s queued=%s paused=%s gpu_active=%s idle_for=%ss empty_for=%ss",
                         active_running,
                         active_queued,
                         active_paused,
@@ -263,14 +591,29 @@ def main() -> None:
                         int(now - idle_since) if idle_since else 0,
                         int(now - empty_queue_since) if empty_queue_since else 0,
                     )
+                    logger.info("Queue empty; requesting pod termination.")
+                    _terminate_now(api_key, terminate_mode, terminate_all)
+                    return
+            else:
+                empty_queue_since = None
+
+            if idle_enabled and idle_since and now - idle_since >= idle_seconds:
+                logger.info(
+                    "Status: enabled=true running=%s queued=%s paused=%s gpu_active=%s idle_for=%ss empty_for=%ss",
+                    active_running,
+                    active_queued,
+                    active_paused,
+                    gpu_active,
+                    int(now - idle_since) if idle_since else 0,
+                    int(now - empty_queue_since) if empty_queue_since else 0,
                 )
-                _log("Idle threshold reached; requesting pod termination.")
+                logger.info("Idle threshold reached; requesting pod termination.")
                 _terminate_now(api_key, terminate_mode, terminate_all)
                 return
 
             _write_state(
                 {
-                    "timestamp": time.time(),
+                    "timestamp": now,
                     "enabled": enabled,
                     "idle_enabled": idle_enabled,
                     "queue_empty_enabled": queue_enabled,
@@ -282,8 +625,23 @@ def main() -> None:
                     "empty_queue_since": empty_queue_since,
                 }
             )
-            _log(
-                "Status: enabled=true running={} queued={} paused={} gpu_active={} idle_for={}s empty_for={}s".format(
+            status_sig = (
+                enabled,
+                active_running,
+                active_queued,
+                active_paused,
+                gpu_active,
+                idle_since is not None,
+                empty_queue_since is not None,
+            )
+            if (
+                status_sig != last_status_sig
+                or now - last_status_log >= STATUS_HEARTBEAT_SECONDS
+            ):
+                last_status_sig = status_sig
+                last_status_log = now
+                logger.info(
+                    "Status: enabled=true running=%s queued=%s paused=%s gpu_active=%s idle_for=%ss empty_for=%ss",
                     active_running,
                     active_queued,
                     active_paused,
@@ -291,9 +649,8 @@ def main() -> None:
                     int(now - idle_since) if idle_since else 0,
                     int(now - empty_queue_since) if empty_queue_since else 0,
                 )
-            )
-        except (HTTPError, URLError, RuntimeError, sqlite3.Error, OSError) as exc:
-            _log(f"Watchdog error: {exc}")
+        except (http.client.HTTPException, RuntimeError, sqlite3.Error, OSError) as exc:
+            logger.error("Watchdog error: %s", exc)
 
         time.sleep(max(5, poll_seconds))
 
@@ -301,7 +658,7 @@ def main() -> None:
 def _terminate_now(api_key: str, mode: str, terminate_all: bool) -> None:
     pods = _list_pods(api_key)
     if not pods:
-        _log("No pods found; skipping termination.")
+        logger.info("No pods found; skipping termination.")
         return
     env_pod_id = os.getenv("RUNPOD_POD_ID")
     target_ids: List[str] = []
@@ -311,12 +668,12 @@ def _terminate_now(api_key: str, mode: str, terminate_all: bool) -> None:
         target_ids = [pod["id"] for pod in pods if pod.get("id")]
     else:
         if len(pods) > 1:
-            _log(f"Multiple pods found ({len(pods)}); terminating first only.")
+            logger.info("Multiple pods found (%d); terminating first only.", len(pods))
         target_ids = [pods[0]["id"]]
 
     for pod_id in target_ids:
-        _log(f"Sending {mode} request for pod {pod_id}.")
-        _terminate_pod(api_key, pod_id, mode)
+        logger.info("Sending %s request for pod %s.", mode, pod_id)
+    _terminate_pods(api_key, target_ids, mode)
 
 
 if __name__ == "__main__":
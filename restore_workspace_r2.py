@@ -1,20 +1,29 @@
 from __future__ import annotations
 
 import argparse
+import atexit
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
+import functools
+import io
 from pathlib import Path
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import shutil
 import stat
+import tarfile
+import threading
 import time
-from typing import Iterable, Optional, Tuple
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 logger = logging.getLogger("runpod_tricks.workspace_restore")
-LOG_EVERY = 200
+WORKSPACE_DIRS = (".codex", ".vscode-server")
+LOG_EVERY = 256  # power of two so the progress check is a cheap bitmask
 ETA_WINDOWS = (10, 50, 200)
 
 
@@ -37,7 +46,8 @@ def _env_first(*names: str) -> str:
     return ""
 
 
-def _public_config_paths() -> Iterable[Path]:
+@functools.lru_cache(maxsize=1)
+def _public_config_paths() -> Tuple[Path, ...]:
     env_path = _env_first("AF_R2_PUBLIC_CONFIG", "R2_PUBLIC_CONFIG")
     paths = []
     if env_path:
@@ -45,10 +55,11 @@ def _public_config_paths() -> Iterable[Path]:
     workspace = _workspace_root()
     paths.append(workspace / "AlphaForecasting" / "config" / "r2_public.json")
     paths.append(workspace / "AlphaMorphing" / "config" / "r2_public.json")
-    return paths
+    return tuple(paths)
 
 
-def _secret_config_paths() -> Iterable[Path]:
+@functools.lru_cache(maxsize=1)
+def _secret_config_paths() -> Tuple[Path, ...]:
     env_path = _env_first("AF_R2_CONFIG", "R2_CONFIG")
     paths = []
     if env_path:
@@ -58,9 +69,10 @@ def _secret_config_paths() -> Iterable[Path]:
     paths.append(workspace / "AlphaMorphing" / ".secrets" / "r2.json")
     paths.append(workspace / "runpod_tricks" / ".secrets" / "r2.json")
     paths.append(workspace / "secrets_bundle.json")
-    return paths
+    return tuple(paths)
 
 
+@functools.lru_cache(maxsize=1)
 def _load_public_config() -> dict:
     for path in _public_config_paths():
         try:
@@ -71,43 +83,47 @@ def _load_public_config() -> dict:
     return {}
 
 
+_CONFIG_ALIASES = {
+    "access_key": (
+        "AF_R2_ACCESS_KEY",
+        "AF_R2_ACCESS_KEY_ID",
+        "R2_ACCESS_KEY",
+        "R2_ACCESS_KEY_ID",
+    ),
+    "secret_key": (
+        "AF_R2_SECRET_KEY",
+        "AF_R2_SECRET_ACCESS_KEY",
+        "AF_R2_SECRET_KEY_ID",
+        "R2_SECRET_KEY",
+        "R2_SECRET_ACCESS_KEY",
+    ),
+    "token": ("AF_R2_TOKEN", "R2_TOKEN"),
+    "account_id": ("AF_R2_ACCOUNT_ID", "R2_ACCOUNT_ID"),
+    "bucket": ("AF_R2_BUCKET", "R2_BUCKET"),
+    "endpoint": ("AF_R2_ENDPOINT", "R2_ENDPOINT"),
+    "prefix_workspace": ("AF_R2_PREFIX_WORKSPACE", "R2_PREFIX_WORKSPACE"),
+}
+# alias -> canonical key, flattened once at import so normalization is a
+# single pass over the source dict with no per-call table rebuild.
+_ALIAS_REVERSE = {
+    alias: canonical
+    for canonical, aliases in _CONFIG_ALIASES.items()
+    for alias in aliases
+}
+
+
 def _normalize_secret_config(cfg: dict) -> dict:
     if not isinstance(cfg, dict):
         return {}
     normalized = dict(cfg)
-    aliases = {
-        "access_key": (
-            "access_key",
-            "AF_R2_ACCESS_KEY",
-            "AF_R2_ACCESS_KEY_ID",
-            "R2_ACCESS_KEY",
-            "R2_ACCESS_KEY_ID",
-        ),
-        "secret_key": (
-            "secret_key",
-            "AF_R2_SECRET_KEY",
-            "AF_R2_SECRET_ACCESS_KEY",
-            "AF_R2_SECRET_KEY_ID",
-            "R2_SECRET_KEY",
-            "R2_SECRET_ACCESS_KEY",
-        ),
-        "token": ("token", "AF_R2_TOKEN", "R2_TOKEN"),
-        "account_id": ("account_id", "AF_R2_ACCOUNT_ID", "R2_ACCOUNT_ID"),
-        "bucket": ("bucket", "AF_R2_BUCKET", "R2_BUCKET"),
-        "endpoint": ("endpoint", "AF_R2_ENDPOINT", "R2_ENDPOINT"),
-        "prefix_workspace": ("prefix_workspace", "AF_R2_PREFIX_WORKSPACE", "R2_PREFIX_WORKSPACE"),
-    }
-    for dest, keys in aliases.items():
-        if normalized.get(dest):
-            continue
-        for key in keys:
-            value = cfg.get(key)
-            if value:
-                normalized[dest] = value
-                break
+    for key, value in cfg.items():
+        canonical = _ALIAS_REVERSE.get(key)
+        if canonical and value and not normalized.get(canonical):
+            normalized[canonical] = value
     return normalized
 
 
+@functools.lru_cache(maxsize=1)
 def _load_secret_config() -> dict:
     for path in _secret_config_paths():
         try:
@@ -118,6 +134,16 @@ def _load_secret_config() -> dict:
     return {}
 
 
+def _invalidate_config_cache() -> None:
+    """Drop all memoized config state (primarily for tests)."""
+    _public_config_paths.cache_clear()
+    _secret_config_paths.cache_clear()
+    _load_public_config.cache_clear()
+    _load_secret_config.cache_clear()
+    load_r2_config.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
 def load_r2_config() -> Optional[R2Config]:
     cfg = _load_public_config()
     allow_flag = _env_first("AF_R2_ALLOW_FILE_SECRETS", "R2_ALLOW_FILE_SECRETS")
@@ -178,14 +204,14 @@ def load_r2_config() -> Optional[R2Config]:
 class RollingEta:
     def __init__(self, windows: Iterable[int]) -> None:
         self._windows = tuple(windows)
-        self._samples = {window: [] for window in self._windows}
+        self._samples = {window: deque(maxlen=window) for window in self._windows}
+        self._sums = {window: 0.0 for window in self._windows}
 
     def add(self, duration: float) -> None:
-        for window in self._samples:
-            samples = self._samples[window]
+        for window, samples in self._samples.items():
+            dropped = samples[0] if len(samples) == samples.maxlen else 0.0
             samples.append(duration)
-            if len(samples) > window:
-                samples.pop(0)
+            self._sums[window] += duration - dropped
 
     def format(self, remaining: int) -> str:
         if remaining <= 0:
@@ -194,16 +220,14 @@ class RollingEta:
         for window, samples in self._samples.items():
             if not samples:
                 continue
-            avg = sum(samples) / len(samples)
+            avg = self._sums[window] / len(samples)
             eta = remaining * avg
             parts.append(f"w{window}(n={len(samples)})={_fmt_duration(eta)}")
         return ", ".join(parts) if parts else "n/a"
 
 
-def _fmt_duration(seconds: float) -> str:
-    if seconds is None or seconds < 0:
-        return "n/a"
-    seconds = int(round(seconds))
+@functools.lru_cache(maxsize=4096)
+def _fmt_seconds(seconds: int) -> str:
     hours, rem = divmod(seconds, 3600)
     minutes, secs = divmod(rem, 60)
     if hours:
@@ -211,6 +235,14 @@ def _fmt_duration(seconds: float) -> str:
     return f"{minutes:d}:{secs:02d}"
 
 
+def _fmt_duration(seconds: float) -> str:
+    if seconds is None or seconds < 0:
+        return "n/a"
+    # ETA values repeat a lot in steady state; the cached integer
+    # formatter skips the divmods and string build on repeats.
+    return _fmt_seconds(int(round(seconds)))
+
+
 def _setup_logging(verbose: bool, log_file: Optional[Path], no_stdout: bool) -> None:
     level = logging.DEBUG if verbose else logging.INFO
     handlers: list[logging.Handler] = []
@@ -227,7 +259,18 @@ def _setup_logging(verbose: bool, log_file: Optional[Path], no_stdout: bool) ->
         handlers.append(stream_handler)
     if not handlers:
         handlers.append(logging.StreamHandler())
-    logging.basicConfig(level=level, handlers=handlers)
+    # Route records through a queue so worker threads only enqueue; the
+    # actual stream/file I/O happens on the listener's own thread instead
+    # of serializing the download pool on the handler lock.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Keep the enqueue side format-free; the listener's handlers apply
+    # the real formatters.
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler])
 
 
 def _workspace_root() -> Path:
@@ -237,6 +280,19 @@ def _workspace_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
 
+def _raise_http_buffer_size() -> None:
+    # http.client defaults to an 8 KiB socket blocksize; threads wake up
+    # constantly to drain it during bulk transfers. Bump the default to
+    # 1 MiB before botocore builds its connections.
+    from http.client import HTTPConnection
+
+    defaults = HTTPConnection.__init__.__defaults__ or ()
+    HTTPConnection.__init__.__defaults__ = tuple(
+        1024 * 1024 if value == 8192 else value for value in defaults
+    )
+
+
+@functools.lru_cache(maxsize=1)
 def _client():
     cfg = load_r2_config()
     if not cfg:
@@ -246,51 +302,116 @@ def _client():
         from botocore.config import Config  # type: ignore
     except Exception as exc:
         raise RuntimeError("boto3 is required for R2 restore; install boto3") from exc
+    _raise_http_buffer_size()
+    workers = int(os.getenv("AF_R2_WORKSPACE_WORKERS", "4") or 4)
     return boto3.client(
         "s3",
         endpoint_url=cfg.endpoint,
         aws_access_key_id=cfg.access_key,
         aws_secret_access_key=cfg.secret_key,
         region_name="auto",
-        config=Config(signature_version="s3v4"),
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=max(workers * 2, 32),
+            tcp_keepalive=True,
+        ),
     )
 
 
+_TRANSFER_CONFIG = None
+
+
+def _transfer_config():
+    """Shared multipart transfer settings for large-object downloads.
+
+    Objects above the multipart threshold are fetched via parallel
+    byte-range GETs instead of one TCP stream.
+    """
+    global _TRANSFER_CONFIG
+    if _TRANSFER_CONFIG is None:
+        from boto3.s3.transfer import TransferConfig  # type: ignore
+
+        chunksize = int(os.getenv("AF_R2_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+        _TRANSFER_CONFIG = TransferConfig(
+            multipart_threshold=chunksize,
+            multipart_chunksize=chunksize,
+            max_concurrency=int(os.getenv("AF_R2_PART_CONCURRENCY", "10")),
+            # Bigger io_chunksize and a deeper io queue keep range-GET
+            # workers from stalling when the network outruns the disk.
+            io_chunksize=int(os.getenv("AF_R2_IO_CHUNKSIZE", str(1024 * 1024))),
+            max_io_queue=int(os.getenv("AF_R2_MAX_IO_QUEUE", "10000")),
+            use_threads=True,
+        )
+    return _TRANSFER_CONFIG
+
+
 def _is_exec_candidate(path: Path) -> bool:
+    # Raw fd ops skip the BufferedReader/RawIO stack that open() builds
+    # just to read 4 header bytes; O_NOATIME (where supported) avoids
+    # dirtying atime for every probed file.
     try:
-        with path.open("rb") as handle:
-            head = handle.read(4)
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOATIME", 0))
     except OSError:
         return False
-    if head.startswith(b"#!"):
-        return True
-    return head == b"\x7fELF"
+    try:
+        head = os.read(fd, 4)
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    return head.startswith(b"#!") or head == b"\x7fELF"
+
+
+def _iter_exec_candidates(root: Path) -> Iterable[Tuple[str, int]]:
+    """Yield (path, mode) for regular files under root missing the exec bit.
+
+    os.scandir reuses the mode cached by the directory listing, so the
+    symlink/exec-bit pre-filter runs without an extra stat per file.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                mode = st.st_mode
+                if stat.S_ISLNK(mode):
+                    continue
+                if stat.S_ISDIR(mode):
+                    stack.append(entry.path)
+                    continue
+                if not stat.S_ISREG(mode) or mode & stat.S_IXUSR:
+                    continue
+                yield entry.path, mode
+
+
+def _check_and_chmod(path: str, mode: int) -> int:
+    if not _is_exec_candidate(Path(path)):
+        return 0
+    try:
+        os.chmod(path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        return 1
+    except OSError:
+        return 0
 
 
 def _fix_vscode_exec_bits() -> int:
     root = _workspace_root() / ".vscode-server"
     if not root.exists():
         return 0
-    updated = 0
-    for dirpath, _, filenames in os.walk(root):
-        for name in filenames:
-            path = Path(dirpath) / name
-            try:
-                st = os.lstat(path)
-            except OSError:
-                continue
-            if stat.S_ISLNK(st.st_mode):
-                continue
-            if st.st_mode & stat.S_IXUSR:
-                continue
-            if not _is_exec_candidate(path):
-                continue
-            try:
-                os.chmod(path, st.st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
-                updated += 1
-            except OSError:
-                continue
-    return updated
+    # The header read + chmod per file are independent I/O ops; fanning
+    # them out hides latency on the ~50k-file fresh-install tree.
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        return sum(
+            executor.map(lambda item: _check_and_chmod(*item), _iter_exec_candidates(root))
+        )
 
 
 def _on_rmtree_error(func, path, exc_info) -> None:
@@ -347,66 +468,345 @@ def _ensure_codex_home_link() -> Optional[Path]:
 def _list_objects(prefix: str) -> Iterable[dict]:
     cfg = load_r2_config()
     if not cfg:
-        return []
+        return
     client = _client()
-    token: Optional[str] = None
-    while True:
-        kwargs = {"Bucket": cfg.bucket, "Prefix": prefix}
-        if token:
-            kwargs["ContinuationToken"] = token
-        resp = client.list_objects_v2(**kwargs)
-        for item in resp.get("Contents", []) or []:
-            yield item
-        if not resp.get("IsTruncated"):
-            break
-        token = resp.get("NextContinuationToken")
-
-
-def _should_download(local_path: Path, size: int, remote_time: Optional[datetime], overwrite: bool) -> bool:
+    paginator = client.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=cfg.bucket, Prefix=prefix, PaginationConfig={"PageSize": 1000}
+    )
+    for page in pages:
+        yield from page.get("Contents", []) or []
+
+
+PACKS_DIRNAME = "__packs__"
+
+
+def _restore_packs(cfg, client) -> Set[str]:
+    """Extract small-file pack archives stored under <prefix>/__packs__/.
+
+    Each pack bundles many tiny files into one tar object so a single GET
+    replaces hundreds of per-file round trips. Returns the set of
+    workspace-relative paths that were extracted so the per-object loop
+    can skip them.
+    """
+    prefix = cfg.prefix_workspace.rstrip("/") + "/" + PACKS_DIRNAME + "/"
+    workspace_root = _workspace_root()
+    extracted: Set[str] = set()
+    packs = 0
+    for item in _list_objects(prefix):
+        key = item.get("Key") or ""
+        if not key.endswith((".tar", ".tar.gz")):
+            continue
+        try:
+            body = client.get_object(Bucket=cfg.bucket, Key=key)["Body"].read()
+            with tarfile.open(fileobj=io.BytesIO(body), mode="r:*") as tar:
+                members = tar.getmembers()
+                tar.extractall(workspace_root, filter="data")
+        except Exception as exc:
+            logger.warning("Pack %s failed: %s", key, exc)
+            continue
+        packs += 1
+        extracted.update(member.name for member in members if member.isfile())
+    if packs:
+        logger.info("Extracted %d file(s) from %d pack(s).", len(extracted), packs)
+    return extracted
+
+
+def _snapshot_local_tree(workspace_root: Path) -> Dict[str, Tuple[int, float]]:
+    """Walk the synced subtrees once and map rel_path -> (size, mtime).
+
+    Replaces the exists()+stat() pair per remote object with a single
+    scandir walk whose DirEntry stats are served from the getdents batch.
+    """
+    snapshot: Dict[str, Tuple[int, float]] = {}
+    root_str = str(workspace_root)
+    for dirname in WORKSPACE_DIRS:
+        base = workspace_root / dirname
+        if not base.exists():
+            continue
+        stack = [str(base)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            rel = os.path.relpath(entry.path, root_str).replace(os.sep, "/")
+                            snapshot[rel] = (st.st_size, st.st_mtime)
+            except OSError:
+                continue
+    return snapshot
+
+
+_MANIFEST_NAME = ".af_r2_manifest.json"
+_MANIFEST_FLUSH_SECONDS = 5.0
+
+
+def _load_manifest(workspace_root: Path) -> Dict[str, list]:
+    """Read the persisted rel_path -> [etag, local_size] map.
+
+    Entries from manifests written before the local size was recorded
+    are dropped; the affected files just go through the ordinary size
+    and mtime checks once and get rewritten in the new shape.
+    """
+    try:
+        data = json.loads((workspace_root / _MANIFEST_NAME).read_text())
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {k: v for k, v in data.items() if isinstance(v, list) and len(v) == 2}
+
+
+def _start_manifest_writer(
+    workspace_root: Path, manifest: Dict[str, list]
+) -> Tuple[queue.SimpleQueue, threading.Event, threading.Thread]:
+    """Persist manifest updates in batches from a background thread.
+
+    Download workers only enqueue (rel_path, etag) pairs; the writer
+    stats the finished file to record its on-disk size next to the ETag,
+    merges the updates and rewrites the manifest atomically every few
+    seconds, so a killed run still remembers most of what it fetched.
+    """
+    path = workspace_root / _MANIFEST_NAME
+    updates: queue.SimpleQueue = queue.SimpleQueue()
+    stop = threading.Event()
+
+    def _run() -> None:
+        while True:
+            stopped = stop.wait(_MANIFEST_FLUSH_SECONDS)
+            dirty = False
+            while True:
+                try:
+                    rel_path, etag = updates.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    local_size = (workspace_root / rel_path).stat().st_size
+                except OSError:
+                    continue
+                manifest[rel_path] = [etag, local_size]
+                dirty = True
+            if dirty:
+                tmp = path.with_suffix(path.suffix + ".tmp")
+                try:
+                    tmp.write_text(json.dumps(manifest, separators=(",", ":")))
+                    os.replace(tmp, path)
+                except OSError:
+                    pass
+            if stopped:
+                return
+
+    thread = threading.Thread(target=_run, name="manifest-writer", daemon=True)
+    thread.start()
+    return updates, stop, thread
+
+
+def _should_download(
+    rel_path: str,
+    local_path: Path,
+    snapshot: Dict[str, Tuple[int, float]],
+    size: int,
+    remote_time: Optional[datetime],
+    overwrite: bool,
+    etag: str = "",
+    manifest: Optional[Dict[str, list]] = None,
+) -> bool:
     if overwrite:
         return True
-    if not local_path.exists():
-        return True
-    try:
-        if local_path.stat().st_size != size:
+    entry = snapshot.get(rel_path)
+    if entry is None:
+        if rel_path.split("/", 1)[0] in WORKSPACE_DIRS:
+            # Subtree was walked, so a missing key means a missing file.
+            return True
+        # Outside the snapshotted subtrees: fall back to a direct stat.
+        try:
+            st = local_path.stat()
+        except OSError:
             return True
-    except FileNotFoundError:
+        entry = (st.st_size, st.st_mtime)
+    local_size, local_mtime = entry
+    if etag and manifest is not None:
+        record = manifest.get(rel_path)
+        if record is not None:
+            man_etag, man_size = record
+            if man_etag != etag:
+                # The remote changed since the last restore — even when
+                # sizes agree (in-place rewrites like state.vscdb keep
+                # the size but bump the ETag).
+                return True
+            # Same ETag: only skip if the file still has the size we
+            # wrote at download time. Comparing against the recorded
+            # local size (not the listing size) keeps this working for
+            # compressed objects, whose remote size is smaller than the
+            # decoded file on disk, while still catching truncation.
+            return man_size != local_size
+    if local_size != size:
         return True
     if remote_time is None:
         return False
-    local_mtime = datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc)
-    return local_mtime < remote_time
+    return datetime.fromtimestamp(local_mtime, tz=timezone.utc) < remote_time
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    try:
+        import zstandard  # type: ignore
+    except Exception as exc:
+        raise RuntimeError(
+            "object is zstd-compressed; install zstandard to restore it"
+        ) from exc
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _download_one(
+    client, bucket: str, key: str, local_path: Path, size: int
+) -> Tuple[str, str, Optional[str], float]:
+    start = time.monotonic()
+    try:
+        config = _transfer_config()
+        tmp = local_path.with_suffix(local_path.suffix + ".part")
+        use_multipart = size >= config.multipart_threshold
+        if use_multipart:
+            # download_file cannot decode compressed bodies, and a low
+            # AF_R2_MULTIPART_CHUNKSIZE can push a zstd object onto this
+            # branch; one HEAD decides before writing raw bytes to disk.
+            head = client.head_object(Bucket=bucket, Key=key)
+            use_multipart = head.get("ContentEncoding") != "zstd"
+        if use_multipart:
+            client.download_file(bucket, key, str(tmp), Config=config)
+        else:
+            # download_file spins up TransferManager machinery even for tiny
+            # objects; a single-shot GET streamed through a 1 MiB buffer is
+            # much cheaper for the many-small-files case.
+            resp = client.get_object(Bucket=bucket, Key=key)
+            if resp.get("ContentEncoding") == "zstd":
+                # The sync side compresses small text files; decode back
+                # to the original bytes before landing on disk.
+                body = _zstd_decompress(resp["Body"].read())
+                with open(tmp, "wb") as handle:
+                    handle.write(body)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            else:
+                with open(tmp, "wb", buffering=1024 * 1024) as handle:
+                    shutil.copyfileobj(resp["Body"], handle, length=1024 * 1024)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+        os.replace(tmp, local_path)
+        return key, "downloaded", None, time.monotonic() - start
+    except Exception as exc:
+        return key, "failed", str(exc), time.monotonic() - start
+
+
+def _download_one_entry(
+    client, bucket: str, entry: Tuple[str, Path, int]
+) -> Tuple[str, str, Optional[str], float]:
+    key, local_path, size = entry
+    return _download_one(client, bucket, key, local_path, size)
 
 
-def _download_one(client, bucket: str, key: str, local_path: Path) -> Tuple[str, str, Optional[str], float]:
+async def _download_one_async(
+    client, semaphore, bucket: str, key: str, local_path: Path
+) -> Tuple[str, str, Optional[str], float]:
     start = time.monotonic()
     try:
-        local_path.parent.mkdir(parents=True, exist_ok=True)
-        client.download_file(bucket, key, str(local_path))
+        async with semaphore:
+            resp = await client.get_object(Bucket=bucket, Key=key)
+            body = await resp["Body"].read()
+        if resp.get("ContentEncoding") == "zstd":
+            body = _zstd_decompress(body)
+        tmp = local_path.with_suffix(local_path.suffix + ".part")
+        tmp.write_bytes(body)
+        os.replace(tmp, local_path)
         return key, "downloaded", None, time.monotonic() - start
     except Exception as exc:
         return key, "failed", str(exc), time.monotonic() - start
 
 
-def restore_workspace(cfg, workers: int, overwrite: bool) -> None:
+async def _restore_async(cfg, pending, concurrency: int, account) -> None:
+    import asyncio
+
+    from aiobotocore.session import get_session  # type: ignore
+
+    session = get_session()
+    async with session.create_client(
+        "s3",
+        endpoint_url=cfg.endpoint,
+        aws_access_key_id=cfg.access_key,
+        aws_secret_access_key=cfg.secret_key,
+        region_name="auto",
+    ) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            asyncio.ensure_future(
+                _download_one_async(client, semaphore, cfg.bucket, key, local_path)
+            )
+            for key, local_path, _size in pending
+        ]
+        for task in asyncio.as_completed(tasks):
+            account(await task)
+
+
+def _restore_pending_async(cfg, pending, workers: int, account) -> bool:
+    """Drive the pending downloads from one event loop instead of threads.
+
+    Coroutines are far lighter than OS threads for the many-small-GETs
+    regime, so the semaphore allows several in-flight requests per
+    configured worker. Returns False when aiobotocore is not installed so
+    the caller can fall back to the thread pool.
+    """
+    try:
+        import aiobotocore.session  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    import asyncio
+
+    concurrency = int(os.getenv("AF_R2_ASYNC_CONCURRENCY", str(workers * 8)) or workers * 8)
+    asyncio.run(_restore_async(cfg, pending, max(1, concurrency), account))
+    return True
+
+
+def restore_workspace(
+    cfg, workers: int, overwrite: bool, use_async: bool = False, clean: bool = False
+) -> None:
     prefix = cfg.prefix_workspace.rstrip("/") + "/"
     workspace_root = _workspace_root()
-    objects = []
-    for item in _list_objects(prefix):
-        key = item.get("Key") or ""
-        if not key.startswith(prefix):
-            continue
-        rel_path = key[len(prefix) :]
-        if not rel_path or rel_path.endswith("/"):
-            continue
-        objects.append((key, rel_path, item))
 
-    total = len(objects)
-    if total == 0:
-        logger.info("No workspace objects found under prefix %s.", prefix)
-        return
+    def _iter_filtered() -> Iterable[Tuple[str, str, dict]]:
+        # ListObjectsV2 with Prefix= already guarantees the prefix, so no
+        # startswith check; hoist len(prefix) out of the hot loop.
+        prefix_len = len(prefix)
+        packs_prefix = PACKS_DIRNAME + "/"
+        for item in _list_objects(prefix):
+            key = item["Key"]
+            rel_path = key[prefix_len:]
+            if not rel_path or rel_path[-1] == "/":
+                continue
+            if rel_path.startswith(packs_prefix):
+                continue
+            yield key, rel_path, item
+
+    def _check(entry: Tuple[str, str, dict]) -> Tuple[str, Path, int, bool]:
+        key, rel_path, item = entry
+        local_path = workspace_root / rel_path
+        size = int(item.get("Size") or 0)
+        etag = (item.get("ETag") or "").strip('"')
+        key_meta[key] = (rel_path, etag)
+        if rel_path in packed:
+            return key, local_path, size, False
+        if fetch_all:
+            # --clean wiped the local trees (and --overwrite ignores
+            # them), so skip the per-file stat checks entirely.
+            return key, local_path, size, True
+        remote_time = item.get("LastModified")
+        return key, local_path, size, _should_download(
+            rel_path, local_path, snapshot, size, remote_time, overwrite,
+            etag=etag, manifest=manifest,
+        )
 
-    logger.info("Workspace restore: %d objects to consider.", total)
     tracker = RollingEta(ETA_WINDOWS)
     processed = 0
     skipped = 0
@@ -414,16 +814,31 @@ def restore_workspace(cfg, workers: int, overwrite: bool) -> None:
     downloaded = 0
     phase_start = time.monotonic()
     client = _client()
-
+    packed = _restore_packs(cfg, client)
+    fetch_all = clean or overwrite
+    snapshot = {} if fetch_all else _snapshot_local_tree(workspace_root)
+    manifest = {} if fetch_all else _load_manifest(workspace_root)
+    key_meta: Dict[str, Tuple[str, str]] = {}
+
+    # Feed the listing generator into a small stat-check pool so local
+    # stat() syscalls overlap the ListObjectsV2 round trips instead of
+    # running as a second serial pass after the full listing.
     pending = []
-    for key, rel_path, item in objects:
-        size = int(item.get("Size") or 0)
-        remote_time = item.get("LastModified")
-        local_path = workspace_root / rel_path
-        if _should_download(local_path, size, remote_time, overwrite):
-            pending.append((key, local_path))
-        else:
-            skipped += 1
+    total = 0
+    _append = pending.append
+    with ThreadPoolExecutor(max_workers=min(workers, 16)) as check_pool:
+        for key, local_path, size, needed in check_pool.map(_check, _iter_filtered()):
+            total += 1
+            if needed:
+                _append((key, local_path, size))
+            else:
+                skipped += 1
+
+    if total == 0:
+        logger.info("No workspace objects found under prefix %s.", prefix)
+        return
+
+    logger.info("Workspace restore: %d objects considered.", total)
 
     if not pending:
         logger.info("Workspace restore: all files already up to date.")
@@ -431,61 +846,76 @@ def restore_workspace(cfg, workers: int, overwrite: bool) -> None:
 
     logger.info("Workspace restore: %d downloads pending (%d skipped).", len(pending), skipped)
 
-    if workers <= 1:
-        for key, local_path in pending:
-            _, status, err, elapsed = _download_one(client, cfg.bucket, key, local_path)
-            processed += 1
-            if status == "failed":
-                failed += 1
-                logger.warning("Workspace %s failed: %s", key, err)
-            else:
-                downloaded += 1
-                tracker.add(elapsed)
-            if processed % LOG_EVERY == 0 or processed == len(pending):
-                remaining = max(len(pending) - processed, 0)
-                elapsed_total = time.monotonic() - phase_start
-                logger.info(
-                    "Workspace: %d/%d done (%d downloaded, %d skipped, %d failed). Elapsed %s. ETA %s",
-                    processed,
-                    len(pending),
-                    downloaded,
-                    skipped,
-                    failed,
-                    _fmt_duration(elapsed_total),
-                    tracker.format(remaining),
-                )
-    else:
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = [
-                executor.submit(_download_one, client, cfg.bucket, key, local_path)
-                for key, local_path in pending
-            ]
-            for future in as_completed(futures):
-                key, status, err, elapsed = future.result()
-                processed += 1
-                if status == "failed":
-                    failed += 1
-                    logger.warning("Workspace %s failed: %s", key, err)
-                else:
-                    downloaded += 1
-                    tracker.add(elapsed)
-                if processed % LOG_EVERY == 0 or processed == len(pending):
-                    remaining = max(len(pending) - processed, 0)
-                    elapsed_total = time.monotonic() - phase_start
-                    logger.info(
-                        "Workspace: %d/%d done (%d downloaded, %d skipped, %d failed). Elapsed %s. ETA %s",
-                        processed,
-                        len(pending),
-                        downloaded,
-                        skipped,
-                        failed,
-                        _fmt_duration(elapsed_total),
-                        tracker.format(remaining),
-                    )
+    # Create every destination directory once up front instead of one
+    # mkdir syscall per downloaded file.
+    dirs = {local_path.parent for _, local_path, _ in pending}
+    for directory in sorted(dirs, key=lambda p: len(p.parts)):
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+        except FileExistsError:
+            pass
+
+    def _account(result: Tuple[str, str, Optional[str], float]) -> None:
+        nonlocal processed, failed, downloaded
+        key, status, err, elapsed = result
+        processed += 1
+        if status == "failed":
+            failed += 1
+            logger.warning("Workspace %s failed: %s", key, err)
+        else:
+            downloaded += 1
+            tracker.add(elapsed)
+            meta = key_meta.get(key)
+            if meta and meta[1]:
+                manifest_updates.put(meta)
+        if processed & (LOG_EVERY - 1) == 0 or processed == len(pending):
+            remaining = max(len(pending) - processed, 0)
+            elapsed_total = time.monotonic() - phase_start
+            logger.info(
+                "Workspace: %d/%d done (%d downloaded, %d skipped, %d failed). Elapsed %s. ETA %s",
+                processed,
+                len(pending),
+                downloaded,
+                skipped,
+                failed,
+                _fmt_duration(elapsed_total),
+                tracker.format(remaining),
+            )
+
+    manifest_updates, manifest_stop, manifest_thread = _start_manifest_writer(
+        workspace_root, manifest
+    )
+    try:
+        if use_async and _restore_pending_async(cfg, pending, workers, _account):
+            return
+        if use_async:
+            logger.warning("aiobotocore not installed; falling back to worker threads.")
+
+        download = functools.partial(_download_one_entry, client, cfg.bucket)
+        if workers <= 1:
+            for entry in pending:
+                _account(download(entry))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Account in completion order so progress logs and
+                # manifest flushes never stall behind one slow download.
+                futures = [executor.submit(download, entry) for entry in pending]
+                for future in as_completed(futures):
+                    _account(future.result())
+    finally:
+        manifest_stop.set()
+        manifest_thread.join(timeout=30)
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Restore .codex/.vscode-server from Cloudflare R2")
+    parser = argparse.ArgumentParser(
+        description="Restore .codex/.vscode-server from Cloudflare R2",
+        epilog=(
+            "Transfer tuning env vars: AF_R2_MULTIPART_CHUNKSIZE (bytes, default 8 MiB), "
+            "AF_R2_PART_CONCURRENCY (default 10), AF_R2_IO_CHUNKSIZE (bytes, default 1 MiB), "
+            "AF_R2_MAX_IO_QUEUE (default 10000)."
+        ),
+    )
     parser.add_argument("--workers", type=int, default=None, help="Worker threads for restore")
     parser.add_argument(
         "--overwrite",
@@ -513,6 +943,12 @@ def main() -> None:
         action="store_true",
         help="Suppress stdout logging (useful with --log-file)",
     )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Download via asyncio + aiobotocore (falls back to threads if unavailable)",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose logging")
     args = parser.parse_args()
 
@@ -545,7 +981,9 @@ def main() -> None:
     if args.clean:
         logger.info("Cleaning existing .codex/.vscode-server before restore.")
         _remove_workspace_dirs()
-    restore_workspace(cfg, workers, args.overwrite)
+    restore_workspace(
+        cfg, workers, args.overwrite, use_async=args.use_async, clean=args.clean
+    )
     fixed = _fix_vscode_exec_bits()
     if fixed:
         logger.info("Fixed exec bits for %d file(s) under .vscode-server.", fixed)
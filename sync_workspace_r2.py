@@ -1,18 +1,40 @@
 from __future__ import annotations
 
 import argparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import atexit
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime, timezone
+import functools
+import hashlib
+import io
 from pathlib import Path
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import tarfile
 import time
-from typing import Iterable, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
+
+try:  # orjson parses small config dicts ~3x faster; stdlib json works fine too
+    import orjson  # type: ignore
+
+    def _json_loads(path: Path):
+        return orjson.loads(path.read_bytes())
+except ImportError:
+
+    def _json_loads(path: Path):
+        return json.loads(path.read_text())
+
 
 logger = logging.getLogger("runpod_tricks.workspace_sync")
 WORKSPACE_DIRS = (".codex", ".vscode-server")
+# Caches, VCS internals, sockets and rotated logs never need to reach R2.
+_EXCLUDE = re.compile(r"(/\.git/|/__pycache__/|/node_modules/\.cache/|\.sock$|\.log(\.\d+)?$)")
 LOG_EVERY = 200
 ETA_WINDOWS = (10, 50, 200)
 
@@ -36,7 +58,18 @@ def _env_first(*names: str) -> str:
     return ""
 
 
-def _public_config_paths() -> Iterable[Path]:
+_ACCESS_KEY_NAMES = ("AF_R2_ACCESS_KEY", "AF_R2_ACCESS_KEY_ID", "R2_ACCESS_KEY", "R2_ACCESS_KEY_ID")
+_SECRET_KEY_NAMES = (
+    "AF_R2_SECRET_KEY",
+    "AF_R2_SECRET_ACCESS_KEY",
+    "AF_R2_SECRET_KEY_ID",
+    "R2_SECRET_KEY",
+    "R2_SECRET_ACCESS_KEY",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _public_config_paths() -> Tuple[Path, ...]:
     env_path = _env_first("AF_R2_PUBLIC_CONFIG", "R2_PUBLIC_CONFIG")
     paths = []
     if env_path:
@@ -44,10 +77,11 @@ def _public_config_paths() -> Iterable[Path]:
     workspace = _workspace_root()
     paths.append(workspace / "AlphaForecasting" / "config" / "r2_public.json")
     paths.append(workspace / "AlphaMorphing" / "config" / "r2_public.json")
-    return paths
+    return tuple(paths)
 
 
-def _secret_config_paths() -> Iterable[Path]:
+@functools.lru_cache(maxsize=1)
+def _secret_config_paths() -> Tuple[Path, ...]:
     env_path = _env_first("AF_R2_CONFIG", "R2_CONFIG")
     paths = []
     if env_path:
@@ -57,14 +91,15 @@ def _secret_config_paths() -> Iterable[Path]:
     paths.append(workspace / "AlphaMorphing" / ".secrets" / "r2.json")
     paths.append(workspace / "runpod_tricks" / ".secrets" / "r2.json")
     paths.append(workspace / "secrets_bundle.json")
-    return paths
+    return tuple(paths)
 
 
+@functools.lru_cache(maxsize=1)
 def _load_public_config() -> dict:
     for path in _public_config_paths():
         try:
             if path.exists():
-                return json.loads(path.read_text())
+                return _json_loads(path)
         except Exception:
             continue
     return {}
@@ -107,16 +142,18 @@ def _normalize_secret_config(cfg: dict) -> dict:
     return normalized
 
 
+@functools.lru_cache(maxsize=1)
 def _load_secret_config() -> dict:
     for path in _secret_config_paths():
         try:
             if path.exists():
-                return _normalize_secret_config(json.loads(path.read_text()))
+                return _normalize_secret_config(_json_loads(path))
         except Exception:
             continue
     return {}
 
 
+@functools.lru_cache(maxsize=1)
 def load_r2_config() -> Optional[R2Config]:
     cfg = _load_public_config()
     allow_flag = _env_first("AF_R2_ALLOW_FILE_SECRETS", "R2_ALLOW_FILE_SECRETS")
@@ -128,19 +165,12 @@ def load_r2_config() -> Optional[R2Config]:
     account_id = _env_first("AF_R2_ACCOUNT_ID", "R2_ACCOUNT_ID") or merged_cfg.get("account_id") or ""
     bucket = _env_first("AF_R2_BUCKET", "R2_BUCKET") or merged_cfg.get("bucket") or ""
     endpoint = _env_first("AF_R2_ENDPOINT", "R2_ENDPOINT") or merged_cfg.get("endpoint") or ""
-    access_key = _env_first(
-        "AF_R2_ACCESS_KEY",
-        "AF_R2_ACCESS_KEY_ID",
-        "R2_ACCESS_KEY",
-        "R2_ACCESS_KEY_ID",
-    ) or (secret_cfg.get("access_key") if allow_file_secrets else "")
-    secret_key = _env_first(
-        "AF_R2_SECRET_KEY",
-        "AF_R2_SECRET_ACCESS_KEY",
-        "AF_R2_SECRET_KEY_ID",
-        "R2_SECRET_KEY",
-        "R2_SECRET_ACCESS_KEY",
-    ) or (secret_cfg.get("secret_key") if allow_file_secrets else "")
+    access_key = _env_first(*_ACCESS_KEY_NAMES) or (
+        secret_cfg.get("access_key") if allow_file_secrets else ""
+    )
+    secret_key = _env_first(*_SECRET_KEY_NAMES) or (
+        secret_cfg.get("secret_key") if allow_file_secrets else ""
+    )
     token = _env_first("AF_R2_TOKEN", "R2_TOKEN") or (secret_cfg.get("token") if allow_file_secrets else None)
     prefix_workspace = (
         _env_first("AF_R2_PREFIX_WORKSPACE", "R2_PREFIX_WORKSPACE")
@@ -165,28 +195,64 @@ def load_r2_config() -> Optional[R2Config]:
     )
 
 
+_ETA_BUCKETS = ("s", "m", "l")
+
+
+def _size_bucket(size: int) -> str:
+    if size < 64 * 1024:
+        return "s"
+    if size < 1024 * 1024:
+        return "m"
+    return "l"
+
+
 class RollingEta:
+    """Rolling upload-duration tracker, bucketed by file size.
+
+    A run of big extension tarballs would otherwise poison the average
+    for the thousands of tiny files that follow; projecting each bucket's
+    remaining count against its own average keeps the estimate sane.
+    """
+
     def __init__(self, windows: Iterable[int]) -> None:
         self._windows = tuple(windows)
-        self._samples = {window: [] for window in self._windows}
-
-    def add(self, duration: float) -> None:
-        for window in self._samples:
-            samples = self._samples[window]
+        self._samples = {
+            (window, bucket): deque(maxlen=window)
+            for window in self._windows
+            for bucket in _ETA_BUCKETS
+        }
+        self._sums = {key: 0.0 for key in self._samples}
+
+    def add(self, duration: float, size: int) -> None:
+        bucket = _size_bucket(size)
+        for window in self._windows:
+            samples = self._samples[(window, bucket)]
+            dropped = samples[0] if len(samples) == samples.maxlen else 0.0
             samples.append(duration)
-            if len(samples) > window:
-                samples.pop(0)
+            self._sums[(window, bucket)] += duration - dropped
 
-    def format(self, remaining: int) -> str:
-        if remaining <= 0:
+    def format(self, remaining_by_bucket: Dict[str, int]) -> str:
+        if sum(remaining_by_bucket.values()) <= 0:
             return "0s"
         parts = []
-        for window, samples in self._samples.items():
-            if not samples:
+        for window in self._windows:
+            total_n = 0
+            total_sum = 0.0
+            for bucket in _ETA_BUCKETS:
+                total_n += len(self._samples[(window, bucket)])
+                total_sum += self._sums[(window, bucket)]
+            if total_n == 0:
                 continue
-            avg = sum(samples) / len(samples)
-            eta = remaining * avg
-            parts.append(f"w{window}(n={len(samples)})={_fmt_duration(eta)}")
+            overall_avg = total_sum / total_n
+            eta = 0.0
+            for bucket in _ETA_BUCKETS:
+                remaining = remaining_by_bucket.get(bucket, 0)
+                if remaining <= 0:
+                    continue
+                samples = self._samples[(window, bucket)]
+                avg = self._sums[(window, bucket)] / len(samples) if samples else overall_avg
+                eta += remaining * avg
+            parts.append(f"w{window}(n={total_n})={_fmt_duration(eta)}")
         return ", ".join(parts) if parts else "n/a"
 
 
@@ -203,9 +269,21 @@ def _fmt_duration(seconds: float) -> str:
 
 def _setup_logging(verbose: bool) -> None:
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=level, format="%(asctime)s | %(levelname)s | %(message)s")
-
-
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
+    # Route records through a queue so the upload loop only enqueues; the
+    # stream write (which can block on a slow TTY) happens on the
+    # listener's own thread.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+
+
+@functools.lru_cache(maxsize=1)
 def _workspace_root() -> Path:
     env_path = os.getenv("AF_WORKSPACE_ROOT")
     if env_path:
@@ -213,24 +291,61 @@ def _workspace_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
 
-def _iter_workspace_files() -> Iterable[Path]:
+def _iter_workspace_files() -> Iterable[Tuple[str, os.stat_result]]:
+    # os.scandir reuses the type info getdents already returned, unlike
+    # rglob which builds a Path and stats twice per entry via is_file().
+    # The stat result rides along so downstream checks never re-stat.
     root = _workspace_root()
-    for folder in WORKSPACE_DIRS:
-        base = root / folder
-        if not base.exists():
+    stack = [str(root / folder) for folder in WORKSPACE_DIRS if (root / folder).exists()]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
             continue
-        for path in base.rglob("*"):
-            if path.is_file():
-                yield path
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if _EXCLUDE.search(entry.path):
+                            continue
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
 
 
-def _workspace_key(cfg, file_path: Path) -> str:
-    rel_path = file_path.relative_to(_workspace_root()).as_posix()
-    prefix = cfg.prefix_workspace.rstrip("/")
-    return f"{prefix}/{rel_path}"
+def _workspace_key(prefix: str, root_str: str, path_str: str) -> str:
+    # Every file is under the root by construction, so one string slice
+    # beats relative_to's PurePath allocation and part re-walk.
+    return f"{prefix}/{path_str.removeprefix(root_str)}"
+
+
+_TRANSFER_CONFIG = None
+
+
+def _transfer_config():
+    """Shared multipart transfer settings for uploads.
 
+    Large artifacts (extension tarballs and the like) get split into
+    concurrent part uploads instead of one serial PUT stream.
+    """
+    global _TRANSFER_CONFIG
+    if _TRANSFER_CONFIG is None:
+        from boto3.s3.transfer import TransferConfig  # type: ignore
 
-def _client():
+        chunksize = int(os.getenv("AF_R2_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+        _TRANSFER_CONFIG = TransferConfig(
+            multipart_threshold=chunksize,
+            multipart_chunksize=chunksize,
+            max_concurrency=int(os.getenv("AF_R2_PART_CONCURRENCY", "10")),
+            use_threads=True,
+        )
+    return _TRANSFER_CONFIG
+
+
+def _client(workers: int = 4):
     cfg = load_r2_config()
     if not cfg:
         raise RuntimeError("R2 config not available.")
@@ -245,47 +360,382 @@ def _client():
         aws_access_key_id=cfg.access_key,
         aws_secret_access_key=cfg.secret_key,
         region_name="auto",
-        config=Config(signature_version="s3v4"),
+        config=Config(
+            signature_version="s3v4",
+            # botocore's default pool of 10 serializes threads beyond 10
+            # workers ("Connection pool is full"); size it to the pool.
+            max_pool_connections=max(workers, 32),
+            tcp_keepalive=True,
+            retries={"max_attempts": 10, "mode": "adaptive"},
+        ),
     )
 
 
-def _head_object(client, bucket: str, key: str) -> Optional[dict]:
-    try:
-        return client.head_object(Bucket=bucket, Key=key)
-    except Exception:
+_XXHASH = None
+_ZSTD = None
+_COMPRESS_MIN_SIZE = 4096
+# Cap at the multipart threshold so the restore side always takes the
+# single-shot GET path where it knows how to decode the body.
+_COMPRESS_MAX_SIZE = 8 * 1024 * 1024
+_COMPRESS_SUFFIXES = frozenset(
+    {
+        ".json", ".jsonl", ".txt", ".md", ".ini", ".cfg", ".conf", ".toml",
+        ".yml", ".yaml", ".xml", ".csv", ".js", ".ts", ".css", ".html",
+        ".sh", ".py", ".map", ".svg",
+    }
+)
+
+
+def _zstd_mod():
+    """Return the zstandard module, or None when it isn't installed."""
+    global _ZSTD
+    if _ZSTD is None:
+        try:
+            import zstandard  # type: ignore
+
+            _ZSTD = zstandard
+        except ImportError:
+            _ZSTD = False
+    return _ZSTD or None
+
+
+def _is_compressible(path_str: str, size: int) -> bool:
+    if not _COMPRESS_MIN_SIZE < size <= _COMPRESS_MAX_SIZE:
+        return False
+    dot = path_str.rfind(".")
+    return dot != -1 and path_str[dot:].lower() in _COMPRESS_SUFFIXES
+
+
+def _xxhash_mod():
+    """Return the xxhash module, or None when it isn't installed."""
+    global _XXHASH
+    if _XXHASH is None:
+        try:
+            import xxhash  # type: ignore
+
+            _XXHASH = xxhash
+        except ImportError:
+            _XXHASH = False
+    return _XXHASH or None
+
+
+def _content_hash(path_str: str) -> Optional[str]:
+    xxhash = _xxhash_mod()
+    if xxhash is None:
         return None
+    digest = xxhash.xxh3_64()
+    with open(path_str, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+PACKS_DIRNAME = "__packs__"
+_PACK_MAX_TOTAL = 256 * 1024
+_PACK_MIN_COUNT = 20
+
+
+def _upload_tiny_packs(
+    client, cfg, prefix: str, root_str: str, files, remote_index
+) -> Tuple[list, int, int, int]:
+    """Bundle directories full of tiny files into single tar.gz objects.
+
+    Signing plus an HTTPS round trip per PUT dominates for the <1 KiB
+    files .vscode-server scatters around; one pack object per directory
+    replaces dozens of PUTs. The pack key embeds a hash of the member
+    list (path, size, mtime), so an unchanged directory is one dict
+    lookup and stale packs for the same directory are deleted when the
+    content changes. The restore script extracts packs from
+    <prefix>/__packs__/ and tar preserves each member's mtime.
+
+    Returns (files left for per-file upload, bundled file count,
+    packs uploaded, packs already current).
+    """
+    groups: Dict[str, list] = {}
+    for item in files:
+        groups.setdefault(os.path.dirname(item[0]), []).append(item)
+    remaining: list = []
+    bundled = 0
+    packs_uploaded = 0
+    packs_current = 0
+    for dirname, members in groups.items():
+        if (
+            len(members) <= _PACK_MIN_COUNT
+            or sum(st.st_size for _, st in members) >= _PACK_MAX_TOTAL
+        ):
+            remaining.extend(members)
+            continue
+        members.sort()
+        rel_dir = dirname.removeprefix(root_str)
+        dir_hash = hashlib.sha256(rel_dir.encode()).hexdigest()[:12]
+        content = hashlib.sha256()
+        for path_str, st in members:
+            content.update(
+                f"{path_str.removeprefix(root_str)}\0{st.st_size}\0{int(st.st_mtime)}\n".encode()
+            )
+        pack_key = f"{prefix}/{PACKS_DIRNAME}/pack-{dir_hash}-{content.hexdigest()[:16]}.tar.gz"
+        bundled += len(members)
+        if pack_key in remote_index:
+            packs_current += 1
+            continue
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            for path_str, _st in members:
+                tar.add(path_str, arcname=path_str.removeprefix(root_str), recursive=False)
+        buffer.seek(0)
+        # A changed directory gets a new content hash; drop the
+        # superseded pack(s) so restore never re-extracts stale files.
+        stale_prefix = f"{prefix}/{PACKS_DIRNAME}/pack-{dir_hash}-"
+        for key in [k for k in remote_index if k.startswith(stale_prefix)]:
+            try:
+                client.delete_object(Bucket=cfg.bucket, Key=key)
+            except Exception:
+                pass
+            remote_index.pop(key, None)
+        try:
+            client.upload_fileobj(buffer, cfg.bucket, pack_key, Config=_transfer_config())
+        except Exception as exc:
+            logger.warning("Pack %s failed: %s; falling back to per-file upload.", pack_key, exc)
+            bundled -= len(members)
+            remaining.extend(members)
+            continue
+        remote_index[pack_key] = (
+            buffer.getbuffer().nbytes,
+            datetime.now(tz=timezone.utc),
+            "",
+        )
+        packs_uploaded += 1
+    return remaining, bundled, packs_uploaded, packs_current
+
 
+_REMOTE_CACHE_PATH = Path.home() / ".cache" / "runpod_tricks" / "sync_state.json"
 
-def _should_upload(local_path: Path, remote_meta: Optional[dict]) -> bool:
+
+def _load_remote_cache(prefix: str) -> Optional[Dict[str, Tuple[int, datetime, str]]]:
+    """Return the cached remote index if it is fresh enough, else None.
+
+    Re-running the sync within the TTL (AF_R2_REMOTE_CACHE_TTL, default
+    60 s) skips the bucket LIST entirely and diffs against the cache.
+    """
+    ttl = float(os.getenv("AF_R2_REMOTE_CACHE_TTL", "60") or 60)
+    if ttl <= 0:
+        return None
+    try:
+        if time.time() - _REMOTE_CACHE_PATH.stat().st_mtime > ttl:
+            return None
+        data = _json_loads(_REMOTE_CACHE_PATH)
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get("prefix") != prefix:
+        return None
+    index: Dict[str, Tuple[int, datetime, str]] = {}
+    for key, entry in (data.get("index") or {}).items():
+        size, timestamp, etag = entry
+        remote_time = (
+            datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else None
+        )
+        index[key] = (int(size), remote_time, etag or "")
+    return index
+
+
+def _store_remote_cache(prefix: str, index: Dict[str, Tuple[int, datetime, str]]) -> None:
+    payload = {
+        "prefix": prefix,
+        "index": {
+            key: (size, remote_time.timestamp() if remote_time else None, etag)
+            for key, (size, remote_time, etag) in index.items()
+        },
+    }
+    try:
+        _REMOTE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _REMOTE_CACHE_PATH.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")))
+        os.replace(tmp, _REMOTE_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _build_remote_index(client, bucket: str, prefix: str) -> Dict[str, Tuple[int, datetime, str]]:
+    """Map every remote key under prefix to (size, LastModified, ETag).
+
+    One paginated LIST walk replaces a HEAD round trip per local file,
+    which dominates wall time on a tree of thousands of tiny files.
+    """
+    index: Dict[str, Tuple[int, datetime, str]] = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={"PageSize": 1000}):
+        for obj in page.get("Contents", ()):
+            index[obj["Key"]] = (
+                int(obj.get("Size") or 0),
+                obj.get("LastModified"),
+                (obj.get("ETag") or "").strip('"'),
+            )
+    return index
+
+
+def _should_upload(
+    path_str: str, st: os.stat_result, remote_meta: Optional[Tuple[int, datetime, str]]
+) -> bool:
+    if st.st_size == 0 and remote_meta is not None and remote_meta[0] == 0:
+        # Empty both sides (lock/sentinel files) — nothing to transfer.
+        return False
     if remote_meta is None:
         return True
-    try:
-        remote_size = int(remote_meta.get("ContentLength") or 0)
-    except (TypeError, ValueError):
-        remote_size = 0
-    if local_path.stat().st_size != remote_size:
+    remote_size, remote_time, etag = remote_meta
+    if _zstd_mod() is not None and _is_compressible(path_str, st.st_size):
+        # Compressed objects store the zstd body, so remote size and ETag
+        # can't be compared against the local file; mtime decides.
+        if remote_time is None:
+            return False
+        return datetime.fromtimestamp(st.st_mtime, tz=timezone.utc) > remote_time
+    if st.st_size != remote_size:
         return True
-    remote_time = remote_meta.get("LastModified")
+    if etag and "-" not in etag:
+        # Single-part ETag is the content MD5; hashing locally is cheaper
+        # than a PUT and immune to the mtime churn of git checkouts.
+        try:
+            with open(path_str, "rb") as handle:
+                return hashlib.file_digest(handle, "md5").hexdigest() != etag
+        except OSError:
+            return True
+    # Multipart ETags aren't content MD5s; fall back to the mtime compare.
     if remote_time is None:
         return False
-    local_mtime = datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc)
+    local_mtime = datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
     return local_mtime > remote_time
 
 
-def _sync_file(client, cfg, local_path: Path) -> Tuple[str, str, Optional[str], float]:
+def _sync_file(
+    client,
+    cfg,
+    remote_index: Dict[str, Tuple[int, datetime, str]],
+    prefix: str,
+    root_str: str,
+    path_str: str,
+    st: os.stat_result,
+) -> Tuple[str, str, Optional[str], float, int]:
     start = time.monotonic()
-    key = _workspace_key(cfg, local_path)
+    key = _workspace_key(prefix, root_str, path_str)
     try:
-        meta = _head_object(client, cfg.bucket, key)
-        if not _should_upload(local_path, meta):
-            return key, "skipped", None, time.monotonic() - start
-        client.upload_file(str(local_path), cfg.bucket, key)
-        return key, "uploaded", None, time.monotonic() - start
+        remote_meta = remote_index.get(key)
+        if not _should_upload(path_str, st, remote_meta):
+            return key, "skipped", None, time.monotonic() - start, st.st_size
+        digest = _content_hash(path_str)
+        if digest and remote_meta is not None and remote_meta[0] == st.st_size:
+            # Same size but newer local mtime is usually a git checkout
+            # touching timestamps; a stored content hash settles it
+            # cheaper than re-uploading the bytes.
+            try:
+                head = client.head_object(Bucket=cfg.bucket, Key=key)
+                if head.get("Metadata", {}).get("xxh3") == digest:
+                    return key, "skipped", None, time.monotonic() - start, st.st_size
+            except Exception:
+                pass
+        zstd = _zstd_mod()
+        if zstd is not None and _is_compressible(path_str, st.st_size):
+            # Text-heavy config/extension files shrink 3-5x under zstd;
+            # the network is the bottleneck, not CPU.
+            with open(path_str, "rb") as handle:
+                blob = zstd.ZstdCompressor(level=3).compress(handle.read())
+            metadata = {"orig-size": str(st.st_size)}
+            if digest:
+                metadata["xxh3"] = digest
+            client.put_object(
+                Bucket=cfg.bucket,
+                Key=key,
+                Body=blob,
+                ContentEncoding="zstd",
+                Metadata=metadata,
+                ChecksumAlgorithm="CRC32",
+            )
+            remote_index[key] = (
+                st.st_size,
+                datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+                "",
+            )
+            return key, "uploaded", None, time.monotonic() - start, st.st_size
+        # CRC32 trailer checksums let R2 reject a corrupt body in the
+        # same round trip. botocore computes CRC32 in pure Python; CRC32C
+        # would need the optional awscrt package and fails without it.
+        extra_args = {"ChecksumAlgorithm": "CRC32"}
+        if digest:
+            extra_args["Metadata"] = {"xxh3": digest}
+        # A large read buffer keeps the body iterator fed from page cache
+        # in few big preads instead of one small read per HTTP chunk.
+        with open(path_str, "rb", buffering=8 * 1024 * 1024) as handle:
+            client.upload_fileobj(
+                handle, cfg.bucket, key, ExtraArgs=extra_args, Config=_transfer_config()
+            )
+        # Keep the shared index current so a cache refresh after this run
+        # (and any same-run re-check) sees the new object.
+        remote_index[key] = (st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc), "")
+        return key, "uploaded", None, time.monotonic() - start, st.st_size
     except Exception as exc:
-        return key, "failed", str(exc), time.monotonic() - start
+        return key, "failed", str(exc), time.monotonic() - start, st.st_size
 
 
-def sync_workspace(cfg, workers: int) -> None:
+async def _sync_file_async(
+    client, semaphore, cfg, remote_index, prefix: str, root_str: str, path_str: str, st: os.stat_result
+) -> Tuple[str, str, Optional[str], float, int]:
+    start = time.monotonic()
+    key = _workspace_key(prefix, root_str, path_str)
+    try:
+        if not _should_upload(path_str, st, remote_index.get(key)):
+            return key, "skipped", None, time.monotonic() - start, st.st_size
+        with open(path_str, "rb") as handle:
+            body = handle.read()
+        async with semaphore:
+            await client.put_object(
+                Bucket=cfg.bucket, Key=key, Body=body, ChecksumAlgorithm="CRC32"
+            )
+        return key, "uploaded", None, time.monotonic() - start, st.st_size
+    except Exception as exc:
+        return key, "failed", str(exc), time.monotonic() - start, st.st_size
+
+
+async def _sync_async(cfg, files, remote_index, prefix, root_str, concurrency: int, account) -> None:
+    import asyncio
+
+    from aiobotocore.session import get_session  # type: ignore
+
+    session = get_session()
+    async with session.create_client(
+        "s3",
+        endpoint_url=cfg.endpoint,
+        aws_access_key_id=cfg.access_key,
+        aws_secret_access_key=cfg.secret_key,
+        region_name="auto",
+    ) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            asyncio.ensure_future(
+                _sync_file_async(client, semaphore, cfg, remote_index, prefix, root_str, path, st)
+            )
+            for path, st in files
+        ]
+        for task in asyncio.as_completed(tasks):
+            account(await task)
+
+
+def _sync_pending_async(cfg, files, remote_index, prefix, root_str, workers: int, account) -> bool:
+    """Drive the uploads from one event loop instead of worker threads.
+
+    Coroutines are far lighter than OS threads for the many-small-PUTs
+    regime that dominates .codex/.vscode-server. Returns False when
+    aiobotocore is not installed so the caller can fall back to threads.
+    """
+    try:
+        import aiobotocore.session  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    import asyncio
+
+    concurrency = int(os.getenv("AF_R2_ASYNC_CONCURRENCY", str(workers * 8)) or workers * 8)
+    asyncio.run(_sync_async(cfg, files, remote_index, prefix, root_str, max(1, concurrency), account))
+    return True
+
+
+def sync_workspace(cfg, workers: int, use_async: bool = False) -> None:
     files = list(_iter_workspace_files())
     if not files:
         logger.info("No workspace files found to sync.")
@@ -298,65 +748,102 @@ def sync_workspace(cfg, workers: int) -> None:
     skipped = 0
     failed = 0
     uploaded = 0
-    client = _client()
+    client = _client(workers)
+    # Hoisted off the per-file path: the key prefix and workspace root
+    # are constant for the whole run.
+    prefix = cfg.prefix_workspace.rstrip("/")
+    root_str = _workspace_root().as_posix() + "/"
+    remote_index = _load_remote_cache(prefix)
+    if remote_index is None:
+        remote_index = _build_remote_index(client, cfg.bucket, prefix + "/")
+        _store_remote_cache(prefix, remote_index)
+
+    files, bundled, packs_uploaded, packs_current = _upload_tiny_packs(
+        client, cfg, prefix, root_str, files, remote_index
+    )
+    if bundled:
+        logger.info(
+            "Bundled %d tiny file(s) into packs (%d uploaded, %d already current).",
+            bundled,
+            packs_uploaded,
+            packs_current,
+        )
+    if not files:
+        logger.info("Workspace sync: everything was covered by packs.")
+        return
+
+    remaining_by_bucket = {bucket: 0 for bucket in _ETA_BUCKETS}
+    for _path, st in files:
+        remaining_by_bucket[_size_bucket(st.st_size)] += 1
+
+    def _account(result: Tuple[str, str, Optional[str], float, int]) -> None:
+        nonlocal processed, failed, skipped, uploaded
+        key, status, err, elapsed, size = result
+        processed += 1
+        remaining_by_bucket[_size_bucket(size)] -= 1
+        if status == "failed":
+            failed += 1
+            logger.warning("Workspace %s failed: %s", key, err)
+        elif status == "skipped":
+            skipped += 1
+        else:
+            uploaded += 1
+            tracker.add(elapsed, size)
+        if processed % LOG_EVERY == 0 or processed == len(files):
+            elapsed_total = time.monotonic() - phase_start
+            logger.info(
+                "Workspace: %d/%d done (%d uploaded, %d skipped, %d failed). Elapsed %s. ETA %s",
+                processed,
+                len(files),
+                uploaded,
+                skipped,
+                failed,
+                _fmt_duration(elapsed_total),
+                tracker.format(remaining_by_bucket),
+            )
+
+    if use_async:
+        if _sync_pending_async(cfg, files, remote_index, prefix, root_str, workers, _account):
+            return
+        logger.warning("aiobotocore not installed; falling back to worker threads.")
 
     if workers <= 1:
-        for path in files:
-            key, status, err, elapsed = _sync_file(client, cfg, path)
-            processed += 1
-            if status == "failed":
-                failed += 1
-                logger.warning("Workspace %s failed: %s", key, err)
-            elif status == "skipped":
-                skipped += 1
-            else:
-                uploaded += 1
-                tracker.add(elapsed)
-            if processed % LOG_EVERY == 0 or processed == len(files):
-                remaining = max(len(files) - processed, 0)
-                elapsed_total = time.monotonic() - phase_start
-                logger.info(
-                    "Workspace: %d/%d done (%d uploaded, %d skipped, %d failed). Elapsed %s. ETA %s",
-                    processed,
-                    len(files),
-                    uploaded,
-                    skipped,
-                    failed,
-                    _fmt_duration(elapsed_total),
-                    tracker.format(remaining),
-                )
+        for path, st in files:
+            _account(_sync_file(client, cfg, remote_index, prefix, root_str, path, st))
     else:
+        # Keep a bounded in-flight window and top it up the moment any
+        # upload finishes, so the connection pool never drains between
+        # batches the way a bulk submit + as_completed pass can.
+        max_inflight = workers * 4
         with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = [executor.submit(_sync_file, client, cfg, path) for path in files]
-            for future in as_completed(futures):
-                key, status, err, elapsed = future.result()
-                processed += 1
-                if status == "failed":
-                    failed += 1
-                    logger.warning("Workspace %s failed: %s", key, err)
-                elif status == "skipped":
-                    skipped += 1
-                else:
-                    uploaded += 1
-                    tracker.add(elapsed)
-                if processed % LOG_EVERY == 0 or processed == len(files):
-                    remaining = max(len(files) - processed, 0)
-                    elapsed_total = time.monotonic() - phase_start
-                    logger.info(
-                        "Workspace: %d/%d done (%d uploaded, %d skipped, %d failed). Elapsed %s. ETA %s",
-                        processed,
-                        len(files),
-                        uploaded,
-                        skipped,
-                        failed,
-                        _fmt_duration(elapsed_total),
-                        tracker.format(remaining),
+            file_iter = iter(files)
+            inflight = set()
+            while True:
+                for path, st in file_iter:
+                    inflight.add(
+                        executor.submit(_sync_file, client, cfg, remote_index, prefix, root_str, path, st)
                     )
+                    if len(inflight) >= max_inflight:
+                        break
+                if not inflight:
+                    break
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _account(future.result())
+
+    if uploaded:
+        _store_remote_cache(prefix, remote_index)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Sync .codex/.vscode-server to Cloudflare R2")
     parser.add_argument("--workers", type=int, default=None, help="Worker threads for sync")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Upload via asyncio + aiobotocore (falls back to threads if unavailable)",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose logging")
     args = parser.parse_args()
 
@@ -364,15 +851,9 @@ def main() -> None:
     cfg = load_r2_config()
     if not cfg:
         missing = []
-        if not _env_first("AF_R2_ACCESS_KEY", "AF_R2_ACCESS_KEY_ID", "R2_ACCESS_KEY", "R2_ACCESS_KEY_ID"):
+        if not _env_first(*_ACCESS_KEY_NAMES):
             missing.append("AF_R2_ACCESS_KEY")
-        if not _env_first(
-            "AF_R2_SECRET_KEY",
-            "AF_R2_SECRET_ACCESS_KEY",
-            "AF_R2_SECRET_KEY_ID",
-            "R2_SECRET_KEY",
-            "R2_SECRET_ACCESS_KEY",
-        ):
+        if not _env_first(*_SECRET_KEY_NAMES):
             missing.append("AF_R2_SECRET_KEY")
         if missing:
             raise SystemExit(f"R2 credentials missing: {', '.join(missing)}")
@@ -385,7 +866,7 @@ def main() -> None:
     logger.info("Using %d worker(s) for workspace sync.", workers)
     logger.info("Workspace root: %s", _workspace_root())
     logger.info("Prefix: %s", cfg.prefix_workspace)
-    sync_workspace(cfg, workers)
+    sync_workspace(cfg, workers, use_async=args.use_async)
     logger.info("Workspace sync completed.")
 
 